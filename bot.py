@@ -2,11 +2,23 @@ import os
 import logging
 import asyncio
 import random
-import requests
+import itertools
+import aiohttp
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
-import deepai
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, Message
+from telegram.error import BadRequest, NetworkError
+from telegram.ext import AIORateLimiter, Application, CallbackQueryHandler, CommandHandler, MessageHandler, filters, ContextTypes
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +37,15 @@ MAIN_CHANNEL = os.getenv('MAIN_CHANNEL_USERNAME', '@your_main_channel')
 BACKUP_CHANNEL = os.getenv('BACKUP_CHANNEL_USERNAME', '@your_backup_channel')
 MAIN_CHANNEL_NAME = os.getenv('MAIN_CHANNEL_NAME', 'Main Anime Channel')
 BACKUP_CHANNEL_NAME = os.getenv('BACKUP_CHANNEL_NAME', 'Backup Anime Channel')
+WARMUP_IMAGE_CACHE = os.getenv('WARMUP_IMAGE_CACHE', '1') == '1'
+
+# Webhook configuration (polling is used unless USE_WEBHOOK=1)
+USE_WEBHOOK = os.getenv('USE_WEBHOOK', '0') == '1'
+WEBHOOK_DOMAIN = os.getenv('WEBHOOK_DOMAIN')
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN') or '0.0.0.0'
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT') or '8443')
+WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN') or None
+DROP_PENDING_UPDATES = os.getenv('DROP_PENDING_UPDATES', '0') == '1'
 
 # Validate required environment variables
 if not BOT_TOKEN:
@@ -35,6 +56,62 @@ if not DEEP_AI_API_KEY:
     logger.error("❌ DEEP_AI_API_KEY is not set in .env file")
     exit(1)
 
+if USE_WEBHOOK and not WEBHOOK_DOMAIN:
+    logger.error("❌ WEBHOOK_DOMAIN is not set in .env file (required when USE_WEBHOOK=1)")
+    exit(1)
+
+# Channel links and inline keyboard, identical for every message
+MAIN_CHANNEL_URL = f"https://t.me/{MAIN_CHANNEL.lstrip('@')}"
+BACKUP_CHANNEL_URL = f"https://t.me/{BACKUP_CHANNEL.lstrip('@')}"
+CHANNEL_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton(f"🌸 {MAIN_CHANNEL_NAME}", url=MAIN_CHANNEL_URL),
+        InlineKeyboardButton(f"💫 {BACKUP_CHANNEL_NAME}", url=BACKUP_CHANNEL_URL)
+    ],
+    [
+        InlineKeyboardButton("🎲 Get Another Image", callback_data="get_random"),
+        InlineKeyboardButton("❓ Help", callback_data="help")
+    ]
+])
+
+# Help texts, rendered once since the channels never change
+HELP_TEXT = f"""
+🤖 **Anime Channel Bot Help**
+
+🌸 **How it works:**
+• Send me ANY message or photo
+• I'll respond with anime images + channel links
+• Get unlimited fresh anime content!
+
+🎮 **Commands:**
+• /start - Welcome message + anime image
+• /help - Show this help message
+
+✨ **Features:**
+• Unlimited anime images from API
+• Automatic channel promotion
+• High-quality artwork
+• Fresh content every time
+
+💫 **Channels:**
+• Main: {MAIN_CHANNEL}
+• Backup: {BACKUP_CHANNEL}
+
+🎨 Just send me anything and enjoy anime art!
+"""
+
+CALLBACK_HELP_TEXT = f"""
+🤖 **Quick Help**
+
+🌸 Send me any message or photo for anime images!
+
+💫 **Our Channels:**
+• Main: {MAIN_CHANNEL}
+• Backup: {BACKUP_CHANNEL}
+
+🎨 Enjoy unlimited anime content!
+"""
+
 # Anime search terms for variety (you can modify these as needed)
 ANIME_SEARCH_TERMS = [
     'anime girl', 'manga art', 'japanese art', 'anime character',
@@ -68,114 +145,256 @@ FALLBACK_IMAGES = [
     }
 ]
 
-# Set DeepAI API key
-deepai.api_key = DEEP_AI_API_KEY
+# DeepAI text-to-image endpoint; generating an image can take well over 10s
+DEEP_AI_TEXT2IMG_URL = 'https://api.deepai.org/api/text2img'
+DEEP_AI_TIMEOUT = 60
+
+# Number of updates handled at the same time, so one user waiting on DeepAI
+# doesn't hold up everyone else
+CONCURRENT_UPDATES = 256
+
+# Shared HTTP session, created on startup and reused for every API call
+http_session = None
+
+# Keep-alive connection pool size for the shared HTTP session
+HTTP_POOL_SIZE = 100
+HTTP_KEEPALIVE_TIMEOUT = 75
+
+# Cap on simultaneous DeepAI requests, to stay clear of API rate limits
+MAX_CONCURRENT_API_REQUESTS = 20
+api_semaphore = asyncio.Semaphore(MAX_CONCURRENT_API_REQUESTS)
+
+# Pool and semaphore usage, logged on shutdown for tuning the limits above
+http_stats = {
+    'connections_opened': 0,
+    'connections_reused': 0,
+    'requests_waiting': 0,
+    'peak_requests_waiting': 0
+}
+
+# Cache of generated images keyed by (search term, variant), so repeat
+# requests are served from memory instead of calling DeepAI again
+IMAGE_VARIANTS_PER_TERM = 10
+image_cache = TTLCache(maxsize=256, ttl=3600)
+
+# Every (search term, variant) key in shuffled order, cycled so each key is
+# generated and cached once before any key repeats
+IMAGE_KEYS = [
+    (term, variant)
+    for term in ANIME_SEARCH_TERMS
+    for variant in range(1, IMAGE_VARIANTS_PER_TERM + 1)
+]
+random.shuffle(IMAGE_KEYS)
+image_key_cycle = itertools.cycle(IMAGE_KEYS)
+fallback_image_cycle = itertools.cycle(random.sample(FALLBACK_IMAGES, len(FALLBACK_IMAGES)))
 
-def get_random_search_term():
-    """Get a random anime search term"""
-    return random.choice(ANIME_SEARCH_TERMS)
+# Telegram file_id of every image URL already sent, so Telegram can reuse
+# its stored copy instead of downloading the URL again
+file_id_cache = TTLCache(maxsize=4096, ttl=86400)
+
+# Pending DeepAI requests keyed like image_cache, shared by concurrent callers
+inflight_requests = {}
+
+# Background task filling image_cache at startup
+warmup_task = None
+
+# Retries of a Telegram call that hit a flood limit (RetryAfter)
+MAX_FLOOD_RETRIES = 2
+
+def get_next_image_key():
+    """Get the next (search term, variant) key for variety"""
+    return next(image_key_cycle)
 
 def get_fallback_image():
-    """Get a random fallback image"""
-    return random.choice(FALLBACK_IMAGES)
+    """Get the next fallback image"""
+    return next(fallback_image_cycle)
 
-async def fetch_anime_image():
-    """Fetch anime image from DeepAI API"""
-    try:
-        # DeepAI image generation request
-        response = deepai.Completion.create(
-            model="text2img",
-            prompt="anime girl, kawaii, colorful, manga style",
-            width=512,
-            height=512
+async def request_deepai_image(search_term):
+    """Generate an anime image for the search term with DeepAI"""
+    if api_semaphore.locked():
+        logger.warning(f"⏳ {MAX_CONCURRENT_API_REQUESTS} DeepAI requests in flight, waiting for a free slot")
+        http_stats['requests_waiting'] += 1
+        http_stats['peak_requests_waiting'] = max(
+            http_stats['peak_requests_waiting'], http_stats['requests_waiting']
         )
+        try:
+            await api_semaphore.acquire()
+        finally:
+            http_stats['requests_waiting'] -= 1
+    else:
+        await api_semaphore.acquire()
 
-        if response and response.get("output_url"):
-            image_url = response["output_url"]
-            return {
-                'url': image_url,
-                'photographer': 'DeepAI',
-                'alt': 'Anime style generated by DeepAI'
+    try:
+        async with http_session.post(
+            DEEP_AI_TEXT2IMG_URL,
+            data={
+                'text': f"{search_term}, kawaii, colorful, manga style",
+                'width': '512',
+                'height': '512'
             }
-        else:
-            raise Exception("No image generated by DeepAI")
-    except Exception as error:
-        logger.error(f"❌ Error fetching from DeepAI API: {error}")
-        return get_fallback_image()  # Use fallback images if the API fails
-
-def create_channel_keyboard():
-    """Create inline keyboard with channel buttons"""
-    keyboard = [
-        [
-            InlineKeyboardButton(f"🌸 {MAIN_CHANNEL_NAME}", url=f"https://t.me/{MAIN_CHANNEL.replace('@', '')}"),
-            InlineKeyboardButton(f"💫 {BACKUP_CHANNEL_NAME}", url=f"https://t.me/{BACKUP_CHANNEL.replace('@', '')}")
-        ],
-        [
-            InlineKeyboardButton("🎲 Get Another Image", callback_data="get_random"),
-            InlineKeyboardButton("❓ Help", callback_data="help")
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)
+        ) as response:
+            response.raise_for_status()
+            data = json_loads(await response.read())
+    finally:
+        api_semaphore.release()
+
+    if data and data.get("output_url"):
+        return {
+            'url': data["output_url"],
+            'photographer': 'DeepAI',
+            'alt': 'Anime style generated by DeepAI'
+        }
+    raise Exception("No image generated by DeepAI")
+
+async def fetch_anime_image(search_term=None, variant=None):
+    """Fetch anime image from the cache or DeepAI API"""
+    if not (search_term and variant):
+        search_term, variant = get_next_image_key()
+    key = (search_term, variant)
+
+    image_data = image_cache.get(key)
+    if image_data:
+        return image_data
+
+    # Coalesce concurrent misses: later callers await the pending request
+    if key in inflight_requests:
+        # Shield the shared future so a cancelled waiter doesn't cancel it for everyone
+        image_data = await asyncio.shield(inflight_requests[key])
+    else:
+        future = asyncio.get_running_loop().create_future()
+        inflight_requests[key] = future
+        image_data = None
+        try:
+            image_data = await request_deepai_image(search_term)
+            image_cache[key] = image_data
+        except Exception as error:
+            logger.error(f"❌ Error fetching from DeepAI API: {error}")
+        finally:
+            inflight_requests.pop(key, None)
+            if not future.done():
+                future.set_result(image_data)
+
+    return image_data or get_fallback_image()  # Use fallback images if the API fails
+
+def get_photo(url):
+    """Get the Telegram file_id for an image URL, or the URL if not sent yet"""
+    return file_id_cache.get(url, url)
+
+def remember_file_id(url, message):
+    """Store the file_id Telegram assigned to a sent image URL"""
+    if isinstance(message, Message) and message.photo:
+        file_id_cache[url] = message.photo[-1].file_id
+
+async def warmup_image_cache():
+    """Pre-generate, in parallel, the first images image_key_cycle will serve"""
+    await asyncio.gather(
+        *(fetch_anime_image(term, variant) for term, variant in IMAGE_KEYS[:len(ANIME_SEARCH_TERMS)]),
+        return_exceptions=True
+    )
+    logger.info(f"🔥 Image cache warmed up with {len(image_cache)} images")
+
+def create_caption(image_data, user_name, welcome_text=None):
+    """Create the caption shown under an anime image"""
+    if welcome_text:
+        caption = f"{welcome_text}\n\n"
+    else:
+        caption = f"🌸 Here's your anime image, {user_name}! 🌸\n\n"
+    
+    caption += f"🎨 {image_data['alt']}\n"
+    caption += f"📸 Photo by: {image_data['photographer']}\n\n"
+    caption += f"💫 Join our channels for more anime content! 👇"
+    return caption
 
 async def send_anime_with_channels(update: Update, context: ContextTypes.DEFAULT_TYPE, welcome_text: str = None):
     """Send anime image with channel promotion buttons"""
-    try:
-        chat_id = update.effective_chat.id
-        user_name = update.effective_user.first_name or "there"
-        
-        # Send "getting image" message
-        status_message = await context.bot.send_message(
-            chat_id=chat_id,
-            text="🎨 Getting a fresh anime image for you... ✨"
+    chat_id = update.effective_chat.id
+    user_name = update.effective_user.first_name or "there"
+    status_message = None
+    
+    # Stage 1: get an image, falling back to a bundled one if that fails
+    search_term, variant = get_next_image_key()
+    image_data = image_cache.get((search_term, variant))
+    
+    # Only show a "getting image" message when the image must be generated
+    if not image_data:
+        status_message, image_data = await asyncio.gather(
+            context.bot.send_message(
+                chat_id=chat_id,
+                text="🎨 Getting a fresh anime image for you... ✨"
+            ),
+            fetch_anime_image(search_term, variant),
+            return_exceptions=True
         )
         
-        # Fetch anime image
-        image_data = await fetch_anime_image()
+        if isinstance(status_message, Exception):
+            logger.error(f"❌ Error sending status message: {status_message}")
+            status_message = None
         
-        if image_data and image_data.get('url'):
-            # Create caption
-            if welcome_text:
-                caption = f"{welcome_text}\n\n"
-            else:
-                caption = f"🌸 Here's your anime image, {user_name}! 🌸\n\n"
-            
-            caption += f"🎨 {image_data['alt']}\n"
-            caption += f"📸 Photo by: {image_data['photographer']}\n\n"
-            caption += f"💫 Join our channels for more anime content! 👇"
-            
-            # Delete status message
-            await context.bot.delete_message(chat_id=chat_id, message_id=status_message.message_id)
-            
+        if isinstance(image_data, Exception) or not (image_data and image_data.get('url')):
+            logger.error(f"❌ Error fetching anime image: {image_data}")
+            image_data = get_fallback_image()
+    
+    caption = create_caption(image_data, user_name, welcome_text)
+    
+    # Stage 2: send the image once; flood limits are retried by the rate limiter
+    try:
+        if status_message:
+            # Turn the status message into the image in a single call
+            sent_message = await context.bot.edit_message_media(
+                chat_id=chat_id,
+                message_id=status_message.message_id,
+                media=InputMediaPhoto(get_photo(image_data['url']), caption=caption),
+                reply_markup=CHANNEL_KEYBOARD
+            )
+        else:
             # Send image with channel buttons
-            await context.bot.send_photo(
+            sent_message = await context.bot.send_photo(
                 chat_id=chat_id,
-                photo=image_data['url'],
+                photo=get_photo(image_data['url']),
                 caption=caption,
-                reply_markup=create_channel_keyboard()  # Include the channel buttons here
+                reply_markup=CHANNEL_KEYBOARD  # Include the channel buttons here
             )
-            
-            logger.info(f"✅ Image sent successfully to {user_name} ({chat_id})")
-            
-        else:
-            raise Exception("No image data received")
-            
-    except Exception as error:
-        logger.error(f"❌ Error sending anime image: {error}")
+    except BadRequest as error:
+        # Telegram rejected the image (e.g. it couldn't fetch the URL), so nothing
+        # was delivered and a single fallback photo can't be a duplicate
+        logger.error(f"❌ Telegram rejected anime image: {error}")
+        file_id_cache.pop(image_data['url'], None)
+        image_cache.pop((search_term, variant), None)
         
+        if status_message:
+            try:
+                await context.bot.delete_message(chat_id=chat_id, message_id=status_message.message_id)
+            except:
+                pass
+        
+        image_data = get_fallback_image()
         try:
-            # Delete status message if it exists
-            await context.bot.delete_message(chat_id=chat_id, message_id=status_message.message_id)
-        except:
-            pass
+            sent_message = await context.bot.send_photo(
+                chat_id=chat_id,
+                photo=get_photo(image_data['url']),
+                caption=create_caption(image_data, user_name, welcome_text),
+                reply_markup=CHANNEL_KEYBOARD  # Include the channel buttons here
+            )
+        except Exception as error:
+            logger.error(f"❌ Error sending fallback image: {error}")
+            return
+    except NetworkError as error:
+        # A timeout or dropped connection may still have delivered the photo, so
+        # neither send another one nor delete the message it may have become
+        logger.error(f"❌ Error sending anime image: {error}")
+        return
+    except Exception as error:
+        logger.error(f"❌ Error sending anime image: {error}")
         
-        # Send error message with fallback
-        fallback_image = get_fallback_image()
-        await context.bot.send_photo(
-            chat_id=chat_id,
-            photo=fallback_image['url'],
-            caption=f"🌸 Here's your anime image! 🌸\n\n🎨 {fallback_image['alt']}\n📸 Photo by: {fallback_image['photographer']}\n\n💫 Join our channels for more anime content! 👇",
-            reply_markup=create_channel_keyboard()  # Include the channel buttons here
-        )
+        if status_message:
+            try:
+                await context.bot.delete_message(chat_id=chat_id, message_id=status_message.message_id)
+            except:
+                pass
+        return
+    
+    remember_file_id(image_data['url'], sent_message)
+    logger.info("✅ Image sent successfully to %s (%s)", user_name, chat_id)
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command"""
@@ -183,93 +402,119 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     welcome_text = f"🌸 Welcome {user_name}! 🌸\n\n✨ I'm your personal anime bot! Every time you send me a message or photo, I'll respond with a beautiful anime image and show you our amazing channels!"
     
-    logger.info(f"🚀 /start command from {user_name} ({update.effective_chat.id})")
+    logger.info("🚀 /start command from %s (%s)", user_name, update.effective_chat.id)
     
     await send_anime_with_channels(update, context, welcome_text)
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /help command"""
-    help_text = """
-🤖 **Anime Channel Bot Help**
-
-🌸 **How it works:**
-• Send me ANY message or photo
-• I'll respond with anime images + channel links
-• Get unlimited fresh anime content!
-
-🎮 **Commands:**
-• /start - Welcome message + anime image
-• /help - Show this help message
-
-✨ **Features:**
-• Unlimited anime images from API
-• Automatic channel promotion
-• High-quality artwork
-• Fresh content every time
-
-💫 **Channels:**
-• Main: {MAIN_CHANNEL}
-• Backup: {BACKUP_CHANNEL}
-
-🎨 Just send me anything and enjoy anime art!
-    """.format(MAIN_CHANNEL=MAIN_CHANNEL, BACKUP_CHANNEL=BACKUP_CHANNEL)
-    
-    await update.message.reply_text(help_text, parse_mode='Markdown')
+    await update.message.reply_text(HELP_TEXT, parse_mode='Markdown')
 
 async def handle_any_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle any text message from users"""
-    user_name = update.effective_user.first_name or "User"
-    message_text = update.message.text
-    
-    logger.info(f"📝 Message from {user_name}: {message_text[:50]}...")
+    if logger.isEnabledFor(logging.INFO):
+        user_name = update.effective_user.first_name or "User"
+        logger.info("📝 Message from %s: %s...", user_name, update.message.text[:50])
     
     await send_anime_with_channels(update, context)
 
 async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle photo messages from users"""
-    user_name = update.effective_user.first_name or "User"
-    
-    logger.info(f"📸 Photo received from {user_name}")
+    logger.info("📸 Photo received from %s", update.effective_user.first_name or "User")
     
     await send_anime_with_channels(update, context)
 
 async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle inline keyboard button presses"""
     query = update.callback_query
-    await query.answer()
-    
-    user_name = query.from_user.first_name or "User"
+    # Answer the button press while the requested work runs
+    answer_task = asyncio.create_task(query.answer())
     
-    if query.data == "get_random":
-        logger.info(f"🎲 Random image request from {user_name}")
-        await send_anime_with_channels(query, context)
-        
-    elif query.data == "help":
-        help_text = f"""
-🤖 **Quick Help**
-
-🌸 Send me any message or photo for anime images!
-
-💫 **Our Channels:**
-• Main: {MAIN_CHANNEL}
-• Backup: {BACKUP_CHANNEL}
-
-🎨 Enjoy unlimited anime content!
-        """
+    try:
+        user_name = query.from_user.first_name or "User"
         
-        await query.edit_message_caption(
-            caption=help_text,
-            reply_markup=create_channel_keyboard()
-        )
+        if query.data == "get_random":
+            logger.info("🎲 Random image request from %s", user_name)
+            await send_anime_with_channels(update, context)
+            
+        elif query.data == "help":
+            await query.edit_message_caption(
+                caption=CALLBACK_HELP_TEXT,
+                reply_markup=CHANNEL_KEYBOARD
+            )
+    finally:
+        try:
+            await answer_task
+        except Exception as error:
+            logger.error(f"❌ Error answering callback query: {error}")
 
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle errors"""
     logger.error(f"❌ Update {update} caused error {context.error}")
 
+async def count_opened_connection(session, context, params):
+    """Count a new connection opened by the HTTP pool"""
+    http_stats['connections_opened'] += 1
+
+async def count_reused_connection(session, context, params):
+    """Count a request served by a kept-alive pooled connection"""
+    http_stats['connections_reused'] += 1
+
+async def on_startup(application: Application):
+    """Create the shared HTTP session once the event loop is running"""
+    global http_session, warmup_task
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_SIZE,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=300
+    )
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(count_opened_connection)
+    trace_config.on_connection_reuseconn.append(count_reused_connection)
+    http_session = aiohttp.ClientSession(
+        connector=connector,
+        trace_configs=[trace_config],
+        timeout=aiohttp.ClientTimeout(total=DEEP_AI_TIMEOUT),
+        headers={'api-key': DEEP_AI_API_KEY}
+    )
+
+    if WARMUP_IMAGE_CACHE:
+        warmup_task = asyncio.create_task(warmup_image_cache())
+
+async def on_shutdown(application: Application):
+    """Close the shared HTTP session"""
+    if warmup_task:
+        # Let the cancelled requests unwind before their session is closed
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+
+    if http_session:
+        logger.info(
+            f"🔌 HTTP pool: {http_stats['connections_opened']} connections opened, "
+            f"{http_stats['connections_reused']} requests reused a kept-alive connection, "
+            f"peak of {http_stats['peak_requests_waiting']} DeepAI requests waiting for a free slot"
+        )
+        await http_session.close()
+
 def main():
     """Start the bot"""
+    # Use uvloop's faster event loop where available; run_polling picks up the current loop
+    if uvloop:
+        asyncio.set_event_loop(uvloop.new_event_loop())
+    
     # Create application
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .concurrent_updates(CONCURRENT_UPDATES)
+        # Keeps every Bot API call within Telegram's flood limits (30/s overall,
+        # 20/min per group) and retries calls rejected with RetryAfter
+        .rate_limiter(AIORateLimiter(max_retries=MAX_FLOOD_RETRIES))
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
     
     # Add handlers
     application.add_handler(CommandHandler("start", start_command))
@@ -282,7 +527,6 @@ def main():
     application.add_handler(MessageHandler(filters.PHOTO, handle_photo))
     
     # Handle callback queries (button presses)
-    from telegram.ext import CallbackQueryHandler
     application.add_handler(CallbackQueryHandler(handle_callback_query))
     
     # Add error handler
@@ -294,8 +538,23 @@ def main():
     logger.info(f"💫 Backup Channel: {BACKUP_CHANNEL}")
     logger.info("📱 Bot will respond to ANY message with anime images!")
     
-    # Run the bot
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    # Run the bot: Telegram pushes updates to the webhook, or we poll for them
+    if USE_WEBHOOK:
+        logger.info(f"🌐 Listening for webhook updates on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}")
+        application.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=BOT_TOKEN,
+            webhook_url=f"https://{WEBHOOK_DOMAIN}/{BOT_TOKEN}",
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=DROP_PENDING_UPDATES
+        )
+    else:
+        application.run_polling(
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=DROP_PENDING_UPDATES
+        )
 
 if __name__ == '__main__':
     main()